@@ -140,8 +140,10 @@ class MainView(Column):
 
     def to_previous_view(self, e):
         """Method to display the previous view."""
-        # store the current view
-        self.state.default_views.append(self.view.controls[-1])
+        # store the current view and let it release what it doesn't need anymore
+        current_view = self.view.controls[-1]
+        current_view.on_leave()
+        self.state.default_views.append(current_view)
         # clear the current view
         self.view.controls = []
         # retrieve the new view and update
@@ -151,8 +153,10 @@ class MainView(Column):
 
     def to_next_view(self, e):
         """Confirmation event handler to use in views."""
-        # store the current view
-        self.previous_views.append(self.view.controls[-1])
+        # store the current view and let it release what it doesn't need anymore
+        current_view = self.view.controls[-1]
+        current_view.on_leave()
+        self.previous_views.append(current_view)
         # remove all elements from column view
         self.view.controls = []
         # if there are default views left, display them first
@@ -11,6 +11,7 @@
 # If not, see <https://www.gnu.org/licenses/>."""
 # Author: Tobias Sterbak
 import webbrowser
+from pathlib import Path
 from typing import Callable
 
 from app_state import AppState
@@ -28,12 +29,123 @@ from flet import (
     Colors,
     Icons,
     ContinuousRectangleBorder,
+    TextDecoration,
+    TextSpan,
+    TextStyle,
 )
 from loguru import logger
-from styles import Markdown, Text
+from styles import Text
 from views import BaseView
 from widgets import confirm_button, get_title
 
+# static content of the view
+_FDROID_URL = "https://f-droid.org/en/packages/org.fdroid.fdroid.privileged.ota/"
+_GAPPS_URL = "https://wiki.lineageos.org/gapps#downloads"
+_MICROG_URL = "https://github.com/FriendlyNeighborhoodShane/MinMicroG-abuse-CI/releases"
+_MICROG_RELEASES_URL = (
+    "https://github.com/FriendlyNeighborhoodShane/MinMicroG_releases/releases"
+)
+_SELECTED_PREFIX = "Selected addons: "
+
+
+def _mk_opener(url: str) -> Callable:
+    """Create a click handler to open the given url in the browser."""
+    return lambda _: webbrowser.open(url)
+
+
+_OPEN_FDROID = _mk_opener(_FDROID_URL)
+_OPEN_GAPPS = _mk_opener(_GAPPS_URL)
+_OPEN_MICROG = _mk_opener(_MICROG_URL)
+
+
+def _link(text: str, url: str) -> TextSpan:
+    """Create a clickable link to use in a text."""
+    return TextSpan(
+        text,
+        url=url,
+        style=TextStyle(color=Colors.BLUE, decoration=TextDecoration.UNDERLINE),
+    )
+
+
+def _code(text: str) -> TextSpan:
+    """Create a monospaced span to use in a text."""
+    return TextSpan(text, style=TextStyle(font_family="monospace"))
+
+
+def _explain_addons_content() -> Column:
+    """Create the help text of the explain addons dialog."""
+    return Column(
+        [
+            Text("Google Apps:", style="titleMedium"),
+            Text(
+                spans=[
+                    TextSpan(
+                        "There are different packages of Google Apps available. Most notable\n• "
+                    ),
+                    _link("MindTheGapps", _GAPPS_URL),
+                    TextSpan(" and\n• "),
+                    _link("NikGApps", "https://nikgapps.com"),
+                    TextSpan("."),
+                ]
+            ),
+            Text(
+                spans=[
+                    TextSpan(
+                        "These packages are only dependent on your OS version and processor architecture, "
+                        "which can be found on each device specific info page. "
+                        "Filenames on MindTheGApps are of the format "
+                    ),
+                    _code(
+                        "MindTheGapps-<AndroidVersion>-<architecture>-<date>_<time>.zip"
+                    ),
+                    TextSpan(
+                        " (with Android 12L being 12.1) and NikGApps are of the format "
+                    ),
+                    _code(
+                        "NikGapps-<flavour>-<architecture>-<AndroidVersion>-<date>-signed.zip"
+                    ),
+                    TextSpan("."),
+                ]
+            ),
+            Text(
+                "NikGApps come in different flavours ranging from minimal Google support (core) to the full experience (full)."
+            ),
+            Text("MicroG", style="titleMedium"),
+            Text(
+                spans=[
+                    TextSpan("The "),
+                    _link("MicroG", "https://microg.org"),
+                    TextSpan(
+                        " project offers a free-as-in-freedom re-implementation of Google's proprietary Android user space apps and libraries."
+                    ),
+                ]
+            ),
+            Text(
+                spans=[
+                    TextSpan(
+                        "The recommended way to install MicroG is to use the zip file provided here:\n• "
+                    ),
+                    _link(_MICROG_RELEASES_URL, _MICROG_RELEASES_URL),
+                    TextSpan("."),
+                ]
+            ),
+            Text("F-Droid Appstore", style="titleMedium"),
+            Text(
+                spans=[
+                    TextSpan(
+                        "F-Droid is an installable catalogue of libre software apps for Android. "
+                        "The F-Droid client app makes it easy to browse, install, and keep track of updates on your device. "
+                        "You can get the zip file to install this addon here: "
+                    ),
+                    _link(_FDROID_URL, _FDROID_URL),
+                    TextSpan("."),
+                ]
+            ),
+        ],
+        scroll="adaptive",
+        tight=True,
+    )
+
 
 class AddonsView(BaseView):
     def __init__(
@@ -43,47 +155,23 @@ class AddonsView(BaseView):
     ):
         super().__init__(state=state)
         self.on_confirm = on_confirm
+        self.dlg_explain_addons = None
+        self.pick_addons_dialog = None
 
     def build(self):
-        # dialog box to explain OS images and recovery
-        self.dlg_explain_addons = AlertDialog(
-            modal=True,
-            title=Text("What kind of addons are supported?"),
-            content=Markdown(
-                """## Google Apps:
-There are different packages of Google Apps available. Most notable
-- [MindTheGapps](https://wiki.lineageos.org/gapps#downloads) and
-- [NikGApps](https://nikgapps.com).
+        # flet builds the view every time it is displayed, so start from an empty view
+        self.clear()
 
-These packages are only dependent on your OS version and processor architecture, which can be found on each device specific info page.
-Filenames on MindTheGApps are of the format `MindTheGapps-<AndroidVersion>-<architecture>-<date>_<time>.zip` (with Android 12L being 12.1)
-and NikGApps are of the format `NikGapps-<flavour>-<architecture>-<AndroidVersion>-<date>-signed.zip`.
-
-NikGApps come in different flavours ranging from minimal Google support (core) to the full experience (full).
-
-## MicroG
-
-The [MicroG](https://microg.org) project offers a free-as-in-freedom re-implementation of Google's proprietary Android user space apps and libraries.
-
-The recommended way to install MicroG is to use the zip file provided here:
-- [https://github.com/FriendlyNeighborhoodShane/MinMicroG_releases/releases](https://github.com/FriendlyNeighborhoodShane/MinMicroG_releases/releases).
-
-## F-Droid Appstore
-
-F-Droid is an installable catalogue of libre software apps for Android. The F-Droid client app makes it easy to browse, install, and keep track of updates on your device.
-You can get the zip file to install this addon here: [https://f-droid.org/en/packages/org.fdroid.fdroid.privileged.ota](https://f-droid.org/en/packages/org.fdroid.fdroid.privileged.ota).
-""",
-            ),
-            actions=[
-                TextButton("Close", on_click=self.close_close_explain_addons_dlg),
-            ],
-            actions_alignment="end",
-            shape=ContinuousRectangleBorder(radius=0),
-        )
+        # the dialog box to explain addons is only created once it is opened
+        self.dlg_explain_addons = None
 
         # initialize file pickers
         self.pick_addons_dialog = FilePicker(on_result=self.pick_addons_result)
-        self.selected_addons = Text("Selected addons: ")
+        # keep showing previously selected addons if the view is built again
+        self.selected_addons = Text(
+            _SELECTED_PREFIX
+            + ", ".join(Path(path).name for path in self.state.addon_paths)
+        )
 
         # initialize and manage button state.
         # wrap the call to the next step in a call to boot fastboot
@@ -92,9 +180,6 @@ You can get the zip file to install this addon here: [https://f-droid.org/en/pac
         # self.confirm_button.disabled = True
         # self.pick_addons_dialog.on_result = self.enable_button_if_ready
 
-        # attach hidden dialogues
-        self.right_view.controls.append(self.pick_addons_dialog)
-
         # create help/info button to show the help dialog
         info_button = OutlinedButton(
             "What kind of addons?",
@@ -116,70 +201,19 @@ You can get the zip file to install this addon here: [https://f-droid.org/en/pac
 
         # text row to show infos during the process
         self.info_field = Row()
-        # if there is an available download, show the button to the page
-        self.right_view.controls.append(Divider())
-        self.right_view.controls.append(
-            Column(
-                [
-                    Text("Here you can download the F-Droid App-Store:"),
-                    Row(
-                        [
-                            ElevatedButton(
-                                "Download F-Droid App-Store",
-                                icon=Icons.DOWNLOAD_OUTLINED,
-                                on_click=lambda _: webbrowser.open(
-                                    "https://f-droid.org/en/packages/org.fdroid.fdroid.privileged.ota/"
-                                ),
-                                expand=True,
-                            ),
-                        ]
-                    ),
-                    Text(
-                        "Here you can find instructions on how to download the right Google apps for your device."
-                    ),
-                    Row(
-                        [
-                            ElevatedButton(
-                                "Download Google Apps",
-                                icon=Icons.DOWNLOAD_OUTLINED,
-                                on_click=lambda _: webbrowser.open(
-                                    "https://wiki.lineageos.org/gapps#downloads"
-                                ),
-                                expand=True,
-                            ),
-                        ]
-                    ),
-                    Text("Here you can download MicroG:"),
-                    Row(
-                        [
-                            ElevatedButton(
-                                "Download MicroG",
-                                icon=Icons.DOWNLOAD_OUTLINED,
-                                on_click=lambda _: webbrowser.open(
-                                    "https://github.com/FriendlyNeighborhoodShane/MinMicroG-abuse-CI/releases"
-                                ),
-                                expand=True,
-                            ),
-                        ]
-                    ),
-                    Divider(),
-                ]
-            )
-        )
-        # attach the controls for uploading addons
+        # attach the hidden dialogues, the download buttons and the controls for uploading addons at once
         self.right_view.controls.extend(
             [
+                self.pick_addons_dialog,
+                Divider(),
+                self._download_column(),
                 Text("Select addons:", style="titleSmall"),
                 Row(
                     [
                         FilledButton(
                             "Pick the addons you want to install",
                             icon=Icons.UPLOAD_FILE,
-                            on_click=lambda _: self.pick_addons_dialog.pick_files(
-                                allow_multiple=True,
-                                file_type="custom",
-                                allowed_extensions=["zip"],
-                            ),
+                            on_click=self.pick_addons,
                             expand=True,
                         ),
                     ]
@@ -192,29 +226,109 @@ You can get the zip file to install this addon here: [https://f-droid.org/en/pac
         )
         return self.view
 
+    def on_leave(self):
+        """Release the dialog and the controls of the view; it is built again on the next visit."""
+        if self.dlg_explain_addons is not None and self.page is not None:
+            if self.dlg_explain_addons.open:
+                self.page.close(self.dlg_explain_addons)
+            # page.open mounted the dialog in the overlay, so remove it from there
+            if self.dlg_explain_addons in self.page.overlay:
+                self.page.overlay.remove(self.dlg_explain_addons)
+                self.page.update()
+        self.dlg_explain_addons = None
+        if self.pick_addons_dialog is not None:
+            self.pick_addons_dialog.on_result = None
+        self.pick_addons_dialog = None
+        # detach the picker, the download buttons and the rest of the controls
+        self.clear()
+
+    def _download_column(self) -> Column:
+        """Build the column with the download buttons."""
+        return Column(
+            [
+                Text("Here you can download the F-Droid App-Store:"),
+                Row(
+                    [
+                        ElevatedButton(
+                            "Download F-Droid App-Store",
+                            icon=Icons.DOWNLOAD_OUTLINED,
+                            on_click=_OPEN_FDROID,
+                            expand=True,
+                        ),
+                    ]
+                ),
+                Text(
+                    "Here you can find instructions on how to download the right Google apps for your device."
+                ),
+                Row(
+                    [
+                        ElevatedButton(
+                            "Download Google Apps",
+                            icon=Icons.DOWNLOAD_OUTLINED,
+                            on_click=_OPEN_GAPPS,
+                            expand=True,
+                        ),
+                    ]
+                ),
+                Text("Here you can download MicroG:"),
+                Row(
+                    [
+                        ElevatedButton(
+                            "Download MicroG",
+                            icon=Icons.DOWNLOAD_OUTLINED,
+                            on_click=_OPEN_MICROG,
+                            expand=True,
+                        ),
+                    ]
+                ),
+                Divider(),
+            ]
+        )
+
     def open_explain_addons_dlg(self, e):
         """Open the dialog to explain addons."""
-        self.page.dialog = self.dlg_explain_addons
-        self.dlg_explain_addons.open = True
-        self.page.update()
+        if self.dlg_explain_addons is None:
+            self.dlg_explain_addons = AlertDialog(
+                modal=True,
+                title=Text("What kind of addons are supported?"),
+                content=_explain_addons_content(),
+                actions=[
+                    TextButton("Close", on_click=self.close_close_explain_addons_dlg),
+                ],
+                actions_alignment="end",
+                shape=ContinuousRectangleBorder(radius=0),
+            )
+        self.page.open(self.dlg_explain_addons)
 
     def close_close_explain_addons_dlg(self, e):
         """Close the dialog to explain addons."""
-        self.dlg_explain_addons.open = False
-        self.page.update()
+        self.page.close(self.dlg_explain_addons)
+
+    def pick_addons(self, e):
+        """Open the file picker to select addon zip files."""
+        self.pick_addons_dialog.pick_files(
+            allow_multiple=True,
+            file_type="custom",
+            allowed_extensions=["zip"],
+        )
 
     def pick_addons_result(self, e: FilePickerResultEvent):
-        path = ", ".join(map(lambda f: f.name, e.files)) if e.files else "Cancelled!"
+        # collect names and paths of the selected files in a single pass
+        names = []
+        paths = []
+        for f in e.files or []:
+            names.append(f.name)
+            paths.append(f.path)
+        path = ", ".join(names) if names else "Cancelled!"
         # update the textfield with the name of the file
-        self.selected_addons.value = (
-            self.selected_addons.value.split(":")[0] + f": {path}"
-        )
-        if e.files:
-            self.addon_paths = [file.path for file in e.files]
-            self.state.addon_paths = self.addon_paths
-            logger.info(f"Selected addons: {self.addon_paths}")
+        self.selected_addons.value = _SELECTED_PREFIX + path
+        if paths:
+            self.state.addon_paths = paths
+            self.addon_paths = paths
+            # only format the list of paths if the message is actually logged
+            logger.opt(lazy=True).info("Selected addons: {}", lambda: paths)
         else:
             logger.info("No addons selected.")
         # check if the addons works with the device and show the filename in different colors accordingly
-        # update
-        self.selected_addons.update()
+        # all changed controls are sent to the client with a single page update
+        self.page.update()
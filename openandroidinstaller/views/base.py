@@ -57,3 +57,8 @@ class BaseView(Column):
         """Clear the right view."""
         self.right_view.controls = []
         self.right_view_header.controls = []
+
+    def on_leave(
+        self,
+    ):
+        """Hook called when the view is left to show another view."""
@@ -0,0 +1,127 @@
+"""Test the AddonsView class."""
+
+# This file is part of OpenAndroidInstaller.
+# OpenAndroidInstaller is free software: you can redistribute it and/or modify it under the terms of
+# the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+# OpenAndroidInstaller is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License along with OpenAndroidInstaller.
+# If not, see <https://www.gnu.org/licenses/>."""
+# Author: Tobias Sterbak
+from pathlib import Path
+
+import pytest
+
+from openandroidinstaller.app_state import AppState
+from openandroidinstaller.views.addon_view import AddonsView
+
+
+@pytest.fixture
+def addons_view(config_path):
+    state = AppState(platform="linux", config_path=config_path, bin_path=Path("bin"))
+    return AddonsView(state=state, on_confirm=lambda _: None)
+
+
+def test_build_again_does_not_duplicate_controls(addons_view):
+    """Test if building the view again replaces the existing controls."""
+    view = addons_view.build()
+    number_of_controls = len(addons_view.right_view.controls)
+
+    assert addons_view.build() is view
+    assert len(addons_view.right_view.controls) == number_of_controls
+    assert len(addons_view.right_view_header.controls) == 1
+
+
+def test_build_again_restores_selected_addons(addons_view):
+    """Test if building the view again shows the addons from the state."""
+    addons_view.build()
+    addons_view.state.addon_paths = ["/addons/a.zip", "/addons/b.zip"]
+
+    addons_view.build()
+
+    assert addons_view.selected_addons.value == "Selected addons: a.zip, b.zip"
+
+
+class MockFile:
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+
+
+class MockPickerEvent:
+    def __init__(self, files):
+        self.files = files
+
+
+def test_pick_addons_result_multiple_files(mocker, addons_view):
+    """Test if picking several addons updates the label and the state with one page update."""
+    addons_view.build()
+    addons_view.page = mocker.Mock()
+
+    addons_view.pick_addons_result(
+        MockPickerEvent(
+            files=[
+                MockFile(name="a.zip", path="/addons/a.zip"),
+                MockFile(name="b.zip", path="/addons/b.zip"),
+            ]
+        )
+    )
+
+    assert addons_view.selected_addons.value == "Selected addons: a.zip, b.zip"
+    assert addons_view.state.addon_paths == ["/addons/a.zip", "/addons/b.zip"]
+    assert addons_view.state.addon_paths is addons_view.addon_paths
+    addons_view.page.update.assert_called_once()
+
+
+def test_pick_addons_result_cancelled(mocker, addons_view):
+    """Test if a cancelled pick is shown and keeps the previously selected addons."""
+    addons_view.build()
+    addons_view.page = mocker.Mock()
+    addons_view.state.addon_paths = ["/addons/a.zip"]
+
+    addons_view.pick_addons_result(MockPickerEvent(files=None))
+
+    assert addons_view.selected_addons.value == "Selected addons: Cancelled!"
+    assert addons_view.state.addon_paths == ["/addons/a.zip"]
+    addons_view.page.update.assert_called_once()
+
+
+def test_on_leave_releases_controls(mocker, addons_view):
+    """Test if leaving the view closes the dialog, detaches the controls and a new build restores them."""
+    addons_view.build()
+    page = mocker.Mock(overlay=[])
+
+    def open_dialog(control):
+        control.open = True
+        page.overlay.append(control)
+
+    def close_dialog(control):
+        control.open = False
+
+    page.open.side_effect = open_dialog
+    page.close.side_effect = close_dialog
+    addons_view.page = page
+    addons_view.open_explain_addons_dlg(None)
+    dialog = addons_view.dlg_explain_addons
+    picker = addons_view.pick_addons_dialog
+
+    addons_view.on_leave()
+
+    assert addons_view.right_view.controls == []
+    assert addons_view.right_view_header.controls == []
+    assert picker.on_result is None
+    page.close.assert_called_once_with(dialog)
+    assert dialog.open is False
+    assert dialog not in page.overlay
+    assert addons_view.dlg_explain_addons is None
+
+    # coming back to the view builds it again from the state
+    addons_view.state.addon_paths = ["/addons/a.zip", "/addons/b.zip"]
+    addons_view.build()
+
+    assert addons_view.right_view.controls
+    assert addons_view.pick_addons_dialog is not picker
+    assert addons_view.pick_addons_dialog.on_result == addons_view.pick_addons_result
+    assert addons_view.selected_addons.value == "Selected addons: a.zip, b.zip"